@@ -10,11 +10,20 @@ import sys
 try:
     import argparse
     import requests
-    from bs4 import BeautifulSoup
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from bs4 import BeautifulSoup, SoupStrainer
     import csv
     import time
     import os
     import re
+    import html
+    import shutil
+    import sqlite3
+    import threading
+    import traceback
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
     from urllib.parse import urlparse, urljoin
 except ImportError as e:
     print(f"\n[!] Critical Requirement Missing: {e}")
@@ -22,6 +31,21 @@ except ImportError as e:
     print("    pip install requests beautifulsoup4")
     sys.exit(1)
 
+# lxml is optional, but parses photo pages several times faster than html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# orjson is optional too; it parses the API's observation pages straight from bytes
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    import json
+    json_loads = json.loads
+
 # -------------------- Argument Parsing --------------------
 parser = argparse.ArgumentParser(
     description="""
@@ -30,11 +54,10 @@ original filenames of photos (only visible to the uploader) and optionally downl
 the images.
 
 HOW IT WORKS:
-1. Uses the iNaturalist public API to get your observation IDs.
-2. Gets photo IDs for each observation using the API.
-3. Scrapes each photo's web page using your session cookie to retrieve
+1. Uses the iNaturalist public API to list your observations and their photo IDs.
+2. Scrapes each photo's web page using your session cookie to retrieve
    the original filenames.
-4. Writes this data to a CSV and optionally downloads the "original" size images.
+3. Writes this data to a CSV and optionally downloads the "original" size images.
 
 OPTIONS:
   --username USERNAME       iNaturalist username (required).
@@ -46,8 +69,17 @@ OPTIONS:
   --debug                   Print detailed debug output (API/web scraping info).
   --download                Download the original-sized images to ./images/ folder.
   --imagedir DIRECTORY      Specify custom directory for downloaded images.
+  --workers N               Number of observations processed in parallel (default: 4).
   --add-photo-urls          Include photo URLs in the CSV output.
   -o, --out, --output FILENAME   Set the output CSV filename (must end with .csv).
+  --resume                  Append to an existing output CSV, skipping observations already in it,
+                            and reuse cached filenames without re-checking the photo pages.
+  --cache-file FILENAME     Cache of scraped photo pages and downloaded images, used to
+                            skip unchanged work on re-runs (default: inaturalist_cache.db).
+  --no-cache                Clear the cached photo pages before starting, so every photo page is
+                            scraped again. Downloaded images are still recognised and skipped.
+  --skip-filename-scrape    Don't load the photo pages. Filenames come from the API, the cache, or
+                            (with --download) the image download itself.
   --help                    Show this help message and exit.
 
 HOW TO GET YOUR iNaturalist SESSION COOKIE (necessary to get the photo filename):
@@ -71,8 +103,13 @@ parser.add_argument("--verbose", action="store_true", help="Print each CSV row")
 parser.add_argument("--debug", action="store_true", help="Enable debug logging")
 parser.add_argument("--download", action="store_true", help="Download original images")
 parser.add_argument("--imagedir", default="images", help="Directory for downloaded images")
+parser.add_argument("--workers", type=int, default=4, help="Number of observations processed in parallel")
 parser.add_argument("--add-photo-urls", action="store_true", help="Include photo URLs in CSV output")
 parser.add_argument("-o", "--out", "--output", dest="output", help="Output CSV filename (must end with .csv)")
+parser.add_argument("--resume", action="store_true", help="Continue an interrupted run: skip observations already in the output CSV and reuse cached filenames")
+parser.add_argument("--cache-file", default="inaturalist_cache.db", help="Cache of scraped photo pages and downloaded images")
+parser.add_argument("--no-cache", action="store_true", help="Clear the cached photo pages before starting")
+parser.add_argument("--skip-filename-scrape", action="store_true", help="Don't scrape photo pages for filenames")
 
 args = parser.parse_args()
 
@@ -98,8 +135,44 @@ if args.output:
 
 output_filename = args.output if args.output else "inaturalist_filenames.csv"
 
+if args.workers < 1:
+    print(f"\n[!] Invalid Requirement: --workers {args.workers}")
+    print("    The number of workers must be at least 1.")
+    sys.exit(1)
+
+# Create the image directory once here rather than on every download
+if args.download:
+    try:
+        os.makedirs(args.imagedir, exist_ok=True)
+    except OSError as e:
+        print(f"\n[!] File Error: Cannot create image directory '{args.imagedir}': {e}")
+        sys.exit(1)
+
 # -------------------- Globals --------------------
+# Set when the run shuts down (including Ctrl-C) so worker threads stop starting new work
+stopping = threading.Event()
 BASE_API_URL = "https://api.inaturalist.org/v1/observations"
+PHOTO_PAGE_URL_TEMPLATE = "https://www.inaturalist.org/photos/{}"
+S3_ORIGINAL_URL_TEMPLATE = "https://inaturalist-open-data.s3.amazonaws.com/photos/{}/original{}"
+# Extensions the original may be stored under, most common first
+S3_ATTEMPT_EXTENSIONS = [".jpeg", ".jpg", ".png", ".gif"]
+
+# Only these tags are built into the soup; the rest of the page is skipped
+PHOTO_PAGE_STRAINER = SoupStrainer(['title', 'tr', 'a'])
+IMG_STRAINER = SoupStrainer('img')
+
+# Patterns used once per photo, compiled once
+# Size name in the last path segment of a photo URL, e.g. /photos/123/square.jpg?1600000000
+_PHOTO_SIZE_RE = re.compile(r'/(square|thumb|small|medium|large)\.(jpe?g|png|gif)(?=$|\?)', re.I)
+_SAFE_FNAME_RE = re.compile(r'[^\w\-.]')
+# Raw-HTML fast paths for the photo pages, tried before BeautifulSoup
+_TABLE_FILENAME_RE = re.compile(rb'<th[^>]*>\s*Filename\s*</th>\s*<td[^>]*>\s*([^<]+?)\s*</td>', re.I)
+_DATA_FILENAME_RE = re.compile(rb'data-original-filename="([^"]+)"')
+_ORIGINAL_LINK_RE = re.compile(rb'<a\b[^>]*\bhref="([^"]*size=original[^"]*)"[^>]*>\s*original\s*</a>', re.I)
+_IMG_PHOTO_RE = re.compile(rb'<img\b[^>]*\bid="photo"[^>]*>', re.I)
+_SRC_RE = re.compile(rb'\bsrc="([^"]+)"')
+_CONTENT_DISPOSITION_RE = re.compile(r'filename="?([^";]+)"?', re.I)
+
 # Guidelines: Use a custom User-Agent to identify your application.
 HEADERS = {"User-Agent": "iNaturalistPhotoDownloader/1.0"}
 COOKIES = {}
@@ -109,78 +182,258 @@ if args.cookie:
     if args.debug:
         print(f"[DEBUG] Using cookie: _inaturalist_session={args.cookie[:5]}...")
 
-# -------------------- Unified Rate Limit Logic --------------------
+# -------------------- Cache --------------------
+class Cache:
+    """SQLite store kept between runs: photo page validators (ETag /
+    Last-Modified) with the values scraped from that page and when they were
+    fetched, and the images that have already been downloaded."""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL + NORMAL: every put commits, so keep commits cheap but crash-safe
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS photo_page ("
+            "photo_id INTEGER PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "filename TEXT, original_link TEXT, fetched_at REAL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS download ("
+            "obs_id INTEGER, photo_id INTEGER, path TEXT, size INTEGER, "
+            "PRIMARY KEY (obs_id, photo_id))"
+        )
+        self.conn.commit()
+
+    def get_page(self, photo_id):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT etag, last_modified, filename, original_link, fetched_at "
+                "FROM photo_page WHERE photo_id = ?",
+                (photo_id,),
+            ).fetchone()
+
+    def put_page(self, photo_id, etag, last_modified, filename, original_link, fresh=True):
+        """fresh=False stores values that didn't come from the page itself, so
+        a normal run still scrapes the page instead of trusting them."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO photo_page "
+                "(photo_id, etag, last_modified, filename, original_link, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (photo_id, etag, last_modified, filename, original_link, time.time() if fresh else None),
+            )
+            self.conn.commit()
+
+    def get_download(self, obs_id, photo_id):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT path, size FROM download WHERE obs_id = ? AND photo_id = ?",
+                (obs_id, photo_id),
+            ).fetchone()
+
+    def put_download(self, obs_id, photo_id, path, size):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO download (obs_id, photo_id, path, size) VALUES (?, ?, ?, ?)",
+                (obs_id, photo_id, path, size),
+            )
+            self.conn.commit()
+
+    def clear_pages(self):
+        """Forgets the scraped photo pages; the download records are kept."""
+        with self.lock:
+            self.conn.execute("DELETE FROM photo_page")
+            self.conn.commit()
+
+# Photo pages only change when the user edits the photo, so a scraped
+# filename is trusted for this long before the page is revalidated
+PAGE_CACHE_TTL = 30 * 24 * 3600
+
+try:
+    cache = Cache(args.cache_file)
+    if args.no_cache:
+        cache.clear_pages()
+except sqlite3.Error as e:
+    print(f"\n[!] File Error: Cannot open cache file '{args.cache_file}': {e}")
+    print("    Check the path and permissions, or point --cache-file somewhere else.")
+    sys.exit(1)
+
+# -------------------- Rate Limit Logic --------------------
 class RateLimiter:
+    MAX_DELAY = 60.0
+
     def __init__(self, requests_per_second=1.0):
-        self.delay = 1.0 / requests_per_second
+        self.base_delay = 1.0 / requests_per_second
+        self.delay = self.base_delay
         self.last_request_time = 0
+        self.lock = threading.Lock()
+
+    def slow_down(self):
+        # The host told us to back off (429): double the interval
+        with self.lock:
+            self.delay = min(self.MAX_DELAY, self.delay * 2)
+            return self.delay
+
+    def speed_up(self):
+        # Ease back toward the normal rate once requests succeed again
+        with self.lock:
+            self.delay = max(self.base_delay, self.delay / 2)
 
     def wait(self):
-        now = time.time()
-        elapsed = now - self.last_request_time
-        wait_time = max(0, self.delay - elapsed)
+        # Reserve the next free slot under the lock, then sleep outside it so
+        # worker threads queue up behind each other instead of all firing at once.
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.last_request_time + self.delay)
+            self.last_request_time = slot
+        wait_time = slot - now
         if wait_time > 0:
-            time.sleep(wait_time)
-        self.last_request_time = time.time()
+            # Cut short on Ctrl-C; callers check stopping before their next request
+            stopping.wait(wait_time)
 
-# Global rate limiter to be shared across API, Scraper, and Downloader
-# Guidelines: Limit requests to approximately 1 request per second.
-global_limiter = RateLimiter(requests_per_second=1.0)
-
-def rate_limited_request(method, url, **kwargs):
-    global_limiter.wait()
-    if method.lower() == 'get':
-        return requests.get(url, **kwargs)
-    elif method.lower() == 'post':
-        return requests.post(url, **kwargs)
-    else:
-        raise ValueError(f"Unsupported method: {method}")
+class ByteRateLimiter:
+    """Keeps downloaded bytes under a budget over a sliding one-hour window."""
 
-def rate_limited_api_get(url, params=None):
-    # Uses the same global limiter to share the "bucket" with other requests
-    global_limiter.wait()
-    return requests.get(url, params=params)
+    def __init__(self, bytes_per_hour, window=3600.0):
+        self.budget = bytes_per_hour
+        self.window = window
+        self.events = deque()  # (timestamp, bytes)
+        self.total = 0
+        self.lock = threading.Lock()
 
-# -------------------- Fetch Observation IDs --------------------
-def get_observation_ids(username, limit=None):
-    page = 1
-    per_page = 200
-    ids = []
+    def record(self, nbytes):
+        with self.lock:
+            self.events.append((time.monotonic(), nbytes))
+            self.total += nbytes
 
-    while True:
-        params = {"user_login": username, "page": page, "per_page": per_page}
-        if args.debug:
-            print(f"[DEBUG] API GET: {BASE_API_URL} {params}")
-        r = rate_limited_api_get(BASE_API_URL, params)
-        r.raise_for_status()
-        results = r.json().get("results", [])
+    def wait(self):
+        # Sleep only until enough old downloads have aged out of the window
+        wait_time = 0
+        with self.lock:
+            now = time.monotonic()
+            while self.events and self.events[0][0] <= now - self.window:
+                self.total -= self.events.popleft()[1]
+            excess = self.total - self.budget
+            if excess > 0:
+                for timestamp, nbytes in self.events:
+                    excess -= nbytes
+                    if excess <= 0:
+                        wait_time = timestamp + self.window - now
+                        break
+        if wait_time > 0:
+            # Wakes up early on shutdown, so it can't hold up the exit
+            stopping.wait(wait_time)
 
-        for obs in results:
-            ids.append(obs["id"])
-            if limit and len(ids) >= limit:
-                return ids
+# Guidelines: Limit media downloads to < 5GB/hour (with 10% headroom).
+byte_limiter = ByteRateLimiter(bytes_per_hour=5 * 1024**3 * 0.9)
 
-        if not results or (limit and len(ids) >= limit):
-            break
+# Per-host rate limiters: the API, the website and the S3 image bucket are
+# separate services, so they don't need to share one request budget.
+# Guidelines: Limit requests to approximately 1 request per second.
+HOST_RATE_LIMITS = {
+    "api.inaturalist.org": 1.0,
+    "www.inaturalist.org": 1.0,
+    "inaturalist-open-data.s3.amazonaws.com": 10.0,
+}
+DEFAULT_RATE_LIMIT = 1.0
+# Maximum simultaneous connections per host; S3 gets a looser cap than iNaturalist
+HOST_CONCURRENCY = {
+    "inaturalist-open-data.s3.amazonaws.com": 8,
+}
+DEFAULT_CONCURRENCY = 4
 
-        page += 1
+host_limiters = {}
+host_semaphores = {}
+host_lock = threading.Lock()
 
-    return ids
+def get_host_limits(url):
+    host = urlparse(url).netloc
+    with host_lock:
+        if host not in host_limiters:
+            host_limiters[host] = RateLimiter(HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+            host_semaphores[host] = threading.BoundedSemaphore(HOST_CONCURRENCY.get(host, DEFAULT_CONCURRENCY))
+        return host_limiters[host], host_semaphores[host]
 
-# -------------------- Get Photo IDs for an Observation --------------------
-def get_photo_ids(obs_id):
-    url = f"{BASE_API_URL}/{obs_id}"
-    if args.debug:
-        print(f"[DEBUG] API GET: {url}")
-    r = rate_limited_api_get(url)
-    r.raise_for_status()
-    results = r.json().get("results", [])
-    
-    if not results:
-        return []
+# -------------------- HTTP Sessions --------------------
+# One keep-alive session per host so the TCP/TLS handshake is paid once per
+# connection instead of once per request.
+def make_adapter(pool_maxsize):
+    retries = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retries)
+
+def make_session(headers=None, cookies=None):
+    session = requests.Session()
+    # Each known host gets a pool as large as its connection cap, so every
+    # permitted concurrent request reuses a kept-alive connection.
+    session.mount("https://", make_adapter(DEFAULT_CONCURRENCY))
+    session.mount("http://", make_adapter(DEFAULT_CONCURRENCY))
+    for host in HOST_RATE_LIMITS:
+        session.mount(f"https://{host}/", make_adapter(HOST_CONCURRENCY.get(host, DEFAULT_CONCURRENCY)))
+    if headers:
+        session.headers.update(headers)
+    if cookies:
+        session.cookies.update(cookies)
+    return session
+
+api_session = make_session(headers=HEADERS)                   # api.inaturalist.org
+web_session = make_session(headers=HEADERS, cookies=COOKIES)  # www.inaturalist.org (needs the session cookie)
+img_session = make_session(headers=HEADERS)                   # image hosts (S3 / static)
+
+def rate_limited_request(method, url, session=web_session, **kwargs):
+    limiter, semaphore = get_host_limits(url)
+    limiter.wait()
+    semaphore.acquire()
+    try:
+        if method.lower() == 'get':
+            r = session.get(url, **kwargs)
+        elif method.lower() == 'head':
+            r = session.head(url, **kwargs)
+        elif method.lower() == 'post':
+            r = session.post(url, **kwargs)
+        else:
+            raise ValueError(f"Unsupported method: {method}")
+    except BaseException:
+        semaphore.release()
+        raise
+    if kwargs.get("stream"):
+        # The connection stays busy until the body has been read, so the slot
+        # goes with the response; the caller frees it with release_response()
+        r.host_semaphore = semaphore
+    else:
+        semaphore.release()
     
+    # Still rate limited after the adapter's own retries: slow this host down
+    if r.status_code == 429:
+        delay = limiter.slow_down()
+        print(f"[INFO] Rate limited by {urlparse(url).netloc}, slowing to one request every {delay:.1f}s")
+    elif limiter.delay > limiter.base_delay:
+        limiter.speed_up()
+    return r
+
+def release_response(r):
+    """Closes a stream=True response and frees its host's connection slot."""
+    r.close()
+    semaphore = getattr(r, "host_semaphore", None)
+    if semaphore:
+        r.host_semaphore = None
+        semaphore.release()
+
+def rate_limited_api_get(url, params=None, session=api_session):
+    return rate_limited_request('get', url, session=session, params=params)
+
+# -------------------- Get Photos of an Observation --------------------
+def extract_photos(observation):
+    """Builds our photo dicts from one observation record of the API."""
     photos = []
-    for photo in results[0].get("photos", []):
+    for photo in observation.get("photos", []):
         photo_id = photo.get("id")
         if photo_id:
             # Get the URL and process it
@@ -190,22 +443,82 @@ def get_photo_ids(obs_id):
             if args.debug:
                 print(f"[DEBUG] Photo {photo_id} URL: {url}")
             
+            # The API hands back a resized URL (square/small/...); the original
+            # lives next to it, so we can download it without scraping any HTML.
+            # A URL that doesn't look like that is left to the other download methods.
+            original_url, found = _PHOTO_SIZE_RE.subn(r'/original.\2', url or "")
+            if not found:
+                original_url = ""
+            
             photos.append({
                 "id": photo_id,
                 "url": url,
-                "photo_page_url": f"https://www.inaturalist.org/photos/{photo_id}"
+                "original_url": original_url,
+                # Only present in some API responses; saves scraping the photo page
+                "original_filename": photo.get("original_filename") or "",
+                "photo_page_url": PHOTO_PAGE_URL_TEMPLATE.format(photo_id)
             })
     
     return photos
 
+# -------------------- Fetch Observations --------------------
+def get_observations(username, limit=None):
+    """Yields {"id": obs_id, "photos": [...]} for each observation, newest first.
+    The list endpoint already includes each observation's photos, so no second
+    API call per observation is needed. Pages are fetched as the caller consumes
+    them, so only one page of observations is held in memory at a time."""
+    # Cursor pagination on the observation ID: deep page=N requests get slower
+    # and slower on the API side and are capped at 10,000 results.
+    # Newest first, so --limit still picks the most recent observations.
+    per_page = 200
+    last_id = None
+    count = 0
+
+    while True:
+        params = {
+            "user_login": username,
+            "per_page": per_page,
+            "order_by": "id",
+            "order": "desc",
+        }
+        if last_id is not None:
+            params["id_below"] = last_id
+        if args.debug:
+            print(f"[DEBUG] API GET: {BASE_API_URL} {params}")
+        r = rate_limited_api_get(BASE_API_URL, params)
+        r.raise_for_status()
+        results = json_loads(r.content).get("results", [])
+
+        for obs in results:
+            yield {"id": obs["id"], "photos": extract_photos(obs)}
+            count += 1
+            if limit and count >= limit:
+                return
+
+        if len(results) < per_page:
+            return
+
+        last_id = results[-1]["id"]
+
 # -------------------- Scrape Filename and Image URL from Photo Page --------------------
-def scrape_photo_page(photo_id):
-    url = f"https://www.inaturalist.org/photos/{photo_id}"
-    if args.debug:
-        print(f"[DEBUG] Scraping photo page: {url}")
-    r = rate_limited_request('get', url, headers=HEADERS, cookies=COOKIES)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+def match_photo_page(content, url):
+    """Regex-only extraction of (filename, original_size_url); either may be missing."""
+    filename = ""
+    m = _TABLE_FILENAME_RE.search(content) or _DATA_FILENAME_RE.search(content)
+    if m:
+        filename = html.unescape(m.group(1).decode("utf-8", "replace")).strip()
+    
+    original_size_url = None
+    m = _ORIGINAL_LINK_RE.search(content)
+    if m:
+        # The href may be relative to the photo page
+        original_size_url = urljoin(url, html.unescape(m.group(1).decode("utf-8", "replace")))
+    
+    return filename, original_size_url
+
+def parse_photo_page(content, url):
+    """BeautifulSoup extraction of (filename, original_size_url), for when the regexes miss."""
+    soup = BeautifulSoup(content, HTML_PARSER, parse_only=PHOTO_PAGE_STRAINER)
     
     if args.debug:
         print(f"[DEBUG] Page title: {soup.title.string if soup.title else 'No title'}")
@@ -214,19 +527,20 @@ def scrape_photo_page(photo_id):
     filename = ""
     
     # Method 1: Look for table row with "Filename" header
-    for tr in soup.find_all('tr'):
-        th = tr.find('th')
-        if th and th.get_text(strip=True) == "Filename":
-            td = tr.find('td')
+    # (exact header text: other headers may merely contain the word)
+    for th in soup.select('tr > th'):
+        if th.get_text(strip=True) == "Filename":
+            td = th.find_next_sibling('td')
             if td:
                 filename = td.get_text(strip=True)
                 if args.debug:
                     print(f"[DEBUG] Found filename in table: {filename}")
                 break
     
-    # Method 2: If not found, try looking for data-original-filename attribute (backup)
-    if not filename:
-        filename_el = soup.select_one('[data-original-filename]')
+    # Method 2: If not found, try looking for data-original-filename attribute (backup).
+    # That attribute can sit on any tag, so this needs a full parse of the page.
+    if not filename and b'data-original-filename' in content:
+        filename_el = BeautifulSoup(content, HTML_PARSER).select_one('[data-original-filename]')
         if filename_el:
             filename = filename_el.get('data-original-filename')
             if args.debug:
@@ -234,19 +548,19 @@ def scrape_photo_page(photo_id):
     
     # Find the link to the original size image
     original_size_url = None
-    links = soup.find_all('a')
+    links = soup.select('a[href*="size=original"]')
     
     if args.debug:
-        print(f"[DEBUG] Found {len(links)} links on page")
+        print(f"[DEBUG] Found {len(links)} size=original links on page")
         
     for link in links:
         link_text = link.get_text(strip=True).lower()
-        href = link.get('href', '')
-        if args.debug and (link_text == "original" or "size=original" in href):
-            print(f"[DEBUG] Potential match: '{link_text}' -> {href}")
+        if args.debug:
+            print(f"[DEBUG] Potential match: '{link_text}' -> {link.get('href')}")
         
-        if link_text == "original" and "size=original" in href:
-            original_size_url = href
+        if link_text == "original":
+            # The href may be relative to the photo page
+            original_size_url = urljoin(url, link.get('href'))
             if args.debug:
                 print(f"[DEBUG] Found original size link: {original_size_url}")
             break
@@ -258,16 +572,90 @@ def scrape_photo_page(photo_id):
             for link in soup.find_all('a'):
                 print(f"[DEBUG] Link: '{link.get_text(strip=True)}' -> {link.get('href')}")
     
+    return filename, original_size_url
+
+# Lookups already done in this run, so a retried photo or observation costs
+# nothing; only successful results are kept
+_PHOTO_META_CACHE = {}
+_IMAGE_URL_CACHE = {}
+
+def scrape_photo_page(photo_id):
+    """Returns (filename, original_size_url) for a photo."""
+    if photo_id in _PHOTO_META_CACHE:
+        return _PHOTO_META_CACHE[photo_id]
+    filename, original_size_url = fetch_photo_page(photo_id)
+    if filename:
+        _PHOTO_META_CACHE[photo_id] = (filename, original_size_url)
+    return filename, original_size_url
+
+def fetch_photo_page(photo_id):
+    if stopping.is_set():
+        return "", None
+    url = PHOTO_PAGE_URL_TEMPLATE.format(photo_id)
+    if args.debug:
+        print(f"[DEBUG] Scraping photo page: {url}")
+    
+    cached = cache.get_page(photo_id)
+    
+    # Trust filenames scraped recently, or any scraped one when resuming an interrupted
+    # run; names that didn't come from the page (fetched_at NULL) are never trusted here
+    if cached and cached[2] and cached[4] is not None:
+        fresh = time.time() - cached[4] < PAGE_CACHE_TTL
+        if fresh or args.resume:
+            if args.debug:
+                print(f"[DEBUG] Using cached filename for photo {photo_id}: {cached[2]}")
+            return cached[2], cached[3]
+    
+    # Otherwise revalidate against the cached copy; a 304 means nothing to download or parse
+    conditional_headers = {}
+    if cached:
+        etag, last_modified, cached_filename, cached_link, _ = cached
+        if etag:
+            conditional_headers["If-None-Match"] = etag
+        if last_modified:
+            conditional_headers["If-Modified-Since"] = last_modified
+    
+    r = rate_limited_request('get', url, headers=conditional_headers)
+    if r.status_code == 304 and cached:
+        if args.debug:
+            print(f"[DEBUG] Photo page not modified, using cached filename: {cached_filename}")
+        cache.put_page(photo_id, etag, last_modified, cached_filename, cached_link)
+        return cached_filename, cached_link
+    r.raise_for_status()
+    # Fast path: pull both fields straight out of the raw HTML; only build a
+    # soup when the page doesn't look the way the regexes expect
+    filename, original_size_url = match_photo_page(r.content, url)
+    if filename and original_size_url:
+        if args.debug:
+            print(f"[DEBUG] Found filename and original size link by regex")
+    else:
+        soup_filename, soup_link = parse_photo_page(r.content, url)
+        filename = filename or soup_filename
+        original_size_url = original_size_url or soup_link
+    
     if args.debug:
         if filename:
             print(f"[DEBUG] Successfully extracted filename: {filename}")
         else:
             print(f"[DEBUG] Failed to find filename")
     
+    cache.put_page(photo_id, r.headers.get("ETag"), r.headers.get("Last-Modified"),
+                   filename, original_size_url)
+    
     return filename, original_size_url
 
 # -------------------- Get Actual Image URL from Original Size Page --------------------
 def get_actual_image_url(original_link):
+    if original_link in _IMAGE_URL_CACHE:
+        return _IMAGE_URL_CACHE[original_link]
+    actual_url = fetch_actual_image_url(original_link)
+    if actual_url:
+        _IMAGE_URL_CACHE[original_link] = actual_url
+    return actual_url
+
+def fetch_actual_image_url(original_link):
+    if stopping.is_set():
+        return None
     if not original_link:
         print("[ERROR] No original size link provided")
         return None
@@ -276,13 +664,22 @@ def get_actual_image_url(original_link):
         print(f"[DEBUG] Getting actual image URL from: {original_link}")
         
     try:
-        r = rate_limited_request('get', original_link, headers=HEADERS, cookies=COOKIES)
+        r = rate_limited_request('get', original_link)
         r.raise_for_status()
         
         if args.debug:
             print(f"[DEBUG] Successfully loaded original size page ({len(r.content)} bytes)")
+        
+        # Fast path: <img id="photo" src="..."> straight from the raw HTML
+        m = _IMG_PHOTO_RE.search(r.content)
+        src = _SRC_RE.search(m.group(0)) if m else None
+        if src:
+            actual_url = html.unescape(src.group(1).decode("utf-8", "replace"))
+            if args.debug:
+                print(f"[DEBUG] Found actual image URL by regex: {actual_url}")
+            return actual_url
             
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = BeautifulSoup(r.content, HTML_PARSER, parse_only=IMG_STRAINER)
         
         if args.debug:
             print(f"[DEBUG] Looking for img tag with id 'photo'")
@@ -309,17 +706,6 @@ def get_actual_image_url(original_link):
                     print(f"[DEBUG] Found potential image URL via alternate method: {actual_url}")
                 return actual_url
             
-        # If still not found, try direct approach - construct the Amazon S3 URL
-        if not img and original_link and '/photos/' in original_link:
-            try:
-                photo_id = re.search(r'/photos/(\d+)', original_link).group(1)
-                direct_url = f"https://inaturalist-open-data.s3.amazonaws.com/photos/{photo_id}/original.jpeg"
-                if args.debug:
-                    print(f"[DEBUG] Constructed direct S3 URL: {direct_url}")
-                return direct_url
-            except Exception as e:
-                print(f"[ERROR] Failed to construct direct URL: {e}")
-        
         # If we get here, we couldn't find the image
         if args.debug:
             print(f"[DEBUG] Could not find any suitable image URL")
@@ -332,7 +718,26 @@ def get_actual_image_url(original_link):
         return None
 
 # -------------------- Download Image --------------------
-def download_image(img_url, fname, obs_id):
+def file_size(path):
+    """Size of path in bytes, or 0 if it doesn't exist - a single stat() call."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+def image_path(fname, obs_id):
+    # Sanitize filename for filesystem
+    safe_fname = _SAFE_FNAME_RE.sub('_', fname)
+    return os.path.join(args.imagedir, f"{obs_id}_{safe_fname}")
+
+def download_image(img_url, fname, obs_id, fallback_fname=None):
+    """Returns the filename the image was saved under, or False. Without fname
+    the name comes from the response's Content-Disposition header, or else
+    fallback_fname."""
+    tmp_path = None
+    r = None
+    if stopping.is_set():
+        return False
     try:
         if not img_url or img_url == "":
             print(f"[ERROR] No valid URL provided for download")
@@ -340,16 +745,9 @@ def download_image(img_url, fname, obs_id):
         
         if args.debug:
             print(f"[DEBUG] Attempting to download image from: {img_url}")
-            
-        # Make sure image directory exists
-        os.makedirs(args.imagedir, exist_ok=True)
-        
-        # Sanitize filename for filesystem
-        safe_fname = re.sub(r'[^\w\-.]', '_', fname)
-        out_path = os.path.join(args.imagedir, f"{obs_id}_{safe_fname}")
         
         # Download the image
-        r = rate_limited_request('get', img_url, headers=HEADERS, stream=True)
+        r = rate_limited_request('get', img_url, session=img_session, stream=True)
         
         # Check if we got a valid response
         if r.status_code != 200:
@@ -366,20 +764,40 @@ def download_image(img_url, fname, obs_id):
                 print(f"[DEBUG] First 100 bytes: {r.content[:100]}")
             return False
         
-        # Get content size for debug output
-        content_size = int(r.headers.get('content-length', 0))
+        if not fname:
+            m = _CONTENT_DISPOSITION_RE.search(r.headers.get('content-disposition', ''))
+            if m:
+                fname = m.group(1).strip()
+                if args.debug:
+                    print(f"[DEBUG] Filename from Content-Disposition: {fname}")
+            else:
+                fname = fallback_fname
+        out_path = image_path(fname, obs_id)
+        
+        # Copy the raw stream in 1 MB blocks straight into a 1 MB buffered file;
+        # decode_content keeps any gzip/deflate transfer encoding transparent.
+        # The image only appears under its real name once it is complete, so an
+        # interrupted download never leaves a truncated file behind. The temp name
+        # is per thread, as two photos can be saved under the same name at once.
+        r.raw.decode_content = True
+        tmp_path = f"{out_path}.{threading.get_ident()}.part"
+        with open(tmp_path, "wb", buffering=1024 * 1024) as f:
+            shutil.copyfileobj(r.raw, f, length=1024 * 1024)
+        # Body read: free the connection before any wait on the byte budget
+        release_response(r)
         
-        with open(out_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
-                
-        # Verify file was created and has content
-        if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
+        # Verify file was created and has content; the size on disk is what was
+        # actually received, which the Content-Length header may not match
+        downloaded_size = file_size(tmp_path)
+        if downloaded_size > 0:
+            os.replace(tmp_path, out_path)
+            byte_limiter.record(downloaded_size)
+            byte_limiter.wait()
             if args.debug:
-                print(f"[DEBUG] Successfully downloaded image ({content_size} bytes) to: {out_path}")
+                print(f"[DEBUG] Successfully downloaded image ({downloaded_size} bytes) to: {out_path}")
             elif args.verbose:
                 print(f"Downloaded: {out_path}")
-            return True
+            return fname
         else:
             print(f"[ERROR] File was not created or is empty: {out_path}")
             return False
@@ -387,106 +805,385 @@ def download_image(img_url, fname, obs_id):
     except Exception as e:
         print(f"[ERROR] Download failed for {img_url}: {e}")
         return False
+    finally:
+        if r is not None:
+            release_response(r)
+        # Still there only if the download failed part way
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def already_downloaded(photo, obs_id, out_path):
+    """True when the image for this photo doesn't need to be fetched again."""
+    local_size = file_size(out_path)
+    if local_size == 0:
+        return False
+    # Trust a record only for this exact file, so a different --imagedir or a
+    # deleted image folder gets downloaded again
+    recorded = cache.get_download(obs_id, photo["id"])
+    if recorded and recorded[0] == out_path and recorded[1] == local_size:
+        return True
+    
+    # A file we have no record of may be the remains of an interrupted download,
+    # so compare it with the size the server reports before trusting it
+    remote_url = photo["original_url"] or find_s3_original(photo["id"])
+    if not remote_url:
+        return False
+    try:
+        r = rate_limited_request('head', remote_url, session=img_session, allow_redirects=True)
+    except requests.exceptions.RequestException as e:
+        if args.debug:
+            print(f"[DEBUG] HEAD check failed for {remote_url}: {e}")
+        return False
+    remote_size = int(r.headers.get('content-length', 0)) if r.status_code == 200 else 0
+    if remote_size == local_size:
+        cache.put_download(obs_id, photo["id"], out_path, local_size)
+        return True
+    if args.debug:
+        print(f"[DEBUG] {out_path} is {local_size} bytes, server has {remote_size}; downloading again")
+    return False
 
 # -------------------- Direct Download by Photo ID --------------------
-def direct_download_by_photo_id(photo_id, filename, obs_id):
+# Extension of the last original found on S3; almost every photo uses the same one
+s3_ext_hint = S3_ATTEMPT_EXTENSIONS[0]
+
+def probe_s3_original(photo_id, ext):
+    """HEAD one candidate S3 URL; returns it if the object exists."""
+    if stopping.is_set():
+        return None
+    direct_url = S3_ORIGINAL_URL_TEMPLATE.format(photo_id, ext)
+    try:
+        r = rate_limited_request('head', direct_url, session=img_session, allow_redirects=True, timeout=10)
+    except requests.exceptions.RequestException as e:
+        if args.debug:
+            print(f"[DEBUG] HEAD {direct_url} failed: {e}")
+        return None
+    if args.debug:
+        print(f"[DEBUG] HEAD {direct_url}: HTTP {r.status_code}")
+    return direct_url if r.status_code == 200 else None
+
+def find_s3_original(photo_id):
+    """Returns the S3 URL of the photo's original, or None if no extension matches."""
+    global s3_ext_hint
+    hint = s3_ext_hint
+    direct_url = probe_s3_original(photo_id, hint)
+    if direct_url:
+        return direct_url
+    
+    # Hint missed: probe the remaining extensions at once and take the first hit
+    others = [ext for ext in S3_ATTEMPT_EXTENSIONS if ext != hint]
+    with ThreadPoolExecutor(max_workers=len(others)) as pool:
+        futures = {pool.submit(probe_s3_original, photo_id, ext): ext for ext in others}
+        for future in as_completed(futures):
+            direct_url = future.result()
+            if direct_url:
+                for other in futures:
+                    other.cancel()
+                s3_ext_hint = futures[future]
+                return direct_url
+    return None
+
+def direct_download_by_photo_id(photo_id, filename, obs_id, fallback_fname=None):
     """Try to download directly using the S3 URL pattern"""
     try:
-        direct_url = f"https://inaturalist-open-data.s3.amazonaws.com/photos/{photo_id}/original.jpeg"
+        # Cheap HEAD probes first; only GET the URL that exists
+        direct_url = find_s3_original(photo_id)
+        if not direct_url:
+            print(f"[ERROR] No original found on S3 for photo {photo_id}")
+            return False
         
         if args.debug:
             print(f"[DEBUG] Trying direct download from: {direct_url}")
-            
-        return download_image(direct_url, filename, obs_id)
+        return download_image(direct_url, filename, obs_id, fallback_fname)
     except Exception as e:
         print(f"[ERROR] Direct download failed: {e}")
         return False
 
+# -------------------- Process One Photo --------------------
+def process_photo(photo, obs_id):
+    """Returns (filename, photo_page_url, original_link, downloaded, already_there) for one photo."""
+    photo_id = photo["id"]
+    photo_page_url = photo["photo_page_url"]
+    if stopping.is_set():
+        return "", photo_page_url, None, False, False
+    
+    if photo["original_filename"]:
+        # The API already gave us the filename, so there's no page to scrape
+        filename = photo["original_filename"]
+        original_link = f"{photo_page_url}?size=original"
+        if args.debug:
+            print(f"[DEBUG] Filename for photo {photo_id} from API: {filename}")
+    elif args.skip_filename_scrape:
+        # Use a filename we already know; otherwise the download names the file
+        cached = cache.get_page(photo_id)
+        filename = cached[2] if cached and cached[2] else ""
+        original_link = cached[3] if cached and cached[3] else f"{photo_page_url}?size=original"
+    else:
+        # Scrape filename and original link from the photo page
+        filename, original_link = scrape_photo_page(photo_id)
+    success = False
+    
+    if args.download and (filename or args.skip_filename_scrape) and not stopping.is_set():
+        # Name for an image whose original filename we don't know. It is only
+        # used on disk, never cached as a photo page filename or put in the CSV.
+        ext = os.path.splitext(urlparse(photo["url"] or "").path)[1] or ".jpg"
+        fallback_fname = f"{photo_id}{ext}"
+        if already_downloaded(photo, obs_id, image_path(filename or fallback_fname, obs_id)):
+            if args.verbose or args.debug:
+                print(f"[INFO] Photo {photo_id} already downloaded, skipping")
+            return filename, photo_page_url, original_link, False, True
+        
+        if photo["original_url"]:
+            # Method 1: Original size URL derived from the API photo URL
+            success = download_image(photo["original_url"], filename, obs_id, fallback_fname)
+        
+        if not success and not stopping.is_set():
+            # Method 2: Constructed S3 URL, checked with HEAD before downloading
+            print(f"[INFO] Trying direct S3 download for photo {photo_id}")
+            success = direct_download_by_photo_id(photo_id, filename, obs_id, fallback_fname)
+        
+        if not success and original_link and not stopping.is_set():
+            # Method 3: Scrape the original size page - only needed for photos
+            # that are not in the open data bucket
+            actual_image_url = get_actual_image_url(original_link)
+            if actual_image_url:
+                success = download_image(actual_image_url, filename, obs_id, fallback_fname)
+        
+        if success:
+            out_path = image_path(success, obs_id)
+            cache.put_download(obs_id, photo_id, out_path, file_size(out_path))
+            if not filename and success != fallback_fname:
+                # Content-Disposition gave us the original filename; keep it for the
+                # next --skip-filename-scrape run (a normal run still scrapes the page)
+                filename = success
+                cache.put_page(photo_id, None, None, filename, original_link, fresh=False)
+            print(f"[INFO] Successfully downloaded photo {photo_id}")
+        elif not stopping.is_set():
+            print(f"[ERROR] All download methods failed for photo {photo_id}")
+    
+    return filename, photo_page_url, original_link, bool(success), False
+
+# -------------------- Process One Observation --------------------
+# Photos are fetched by one pool shared by all observations, so photos of
+# different observations overlap too; the per-host semaphores in
+# rate_limited_request keep the number of connections to each host bounded.
+PHOTO_WORKERS = 8
+photo_executor = ThreadPoolExecutor(max_workers=PHOTO_WORKERS)
+
+# The CSV layout is fixed for the whole run, so the row builder is chosen once
+fieldnames = ["observation_id", "photo_filenames"]
+if args.add_photo_urls:
+    fieldnames.extend(["photo_urls", "original_photo_urls"])
+    def build_row(obs_id, filenames, photo_urls, original_urls):
+        return [obs_id, filenames, photo_urls, original_urls]
+else:
+    def build_row(obs_id, filenames, photo_urls, original_urls):
+        return [obs_id, filenames]
+
+def is_transient(error):
+    """True for network errors worth retrying: connection problems, timeouts,
+    429 and 5xx. Other HTTP errors (403, 404, ...) won't go away on a retry."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+def process_observation(obs_id, photos):
+    """Returns (row, photo_count, image_count, downloaded_count, skipped_count), or None if the
+    observation failed. photo_count counts the photos with a filename; image_count the ones
+    a download was attempted for, which with --skip-filename-scrape is all of them.
+    Transient network errors are raised instead, so the main loop can try the observation again."""
+    if args.debug:
+        print(f"[DEBUG] Processing observation {obs_id}")
+
+    try:
+        if args.debug:
+            print(f"[DEBUG] Found {len(photos)} photos for observation {obs_id}")
+        
+        # One (filename, photo_page_url, original_link) tuple per photo with a filename
+        records = []
+        downloaded = 0
+        skipped = 0
+        
+        # Results are collected in submission order so the CSV keeps the photo order.
+        # Every photo finishes before any error is raised, so a retry of this
+        # observation never runs alongside photo tasks left from this attempt.
+        futures = [photo_executor.submit(process_photo, photo, obs_id) for photo in photos]
+        wait(futures)
+        results = [future.result() for future in futures]
+        
+        for filename, photo_page_url, original_link, success, already_there in results:
+            # Only photos with a known original filename go into the CSV, but an
+            # image saved under a fallback name still counts as downloaded
+            if filename:
+                records.append((filename, photo_page_url, original_link or ""))
+            if success:
+                downloaded += 1
+            elif already_there:
+                skipped += 1
+        
+        # Transpose the records into the three ;-joined columns
+        filenames, photo_urls, original_urls = (
+            [";".join(column) for column in zip(*records)] if records else ["", "", ""]
+        )
+        
+        image_count = len(photos) if args.skip_filename_scrape else len(records)
+        row = build_row(obs_id, filenames, photo_urls, original_urls)
+        return row, len(records), image_count, downloaded, skipped
+
+    except requests.exceptions.RequestException as e:
+        if is_transient(e):
+            raise
+        print(f"[ERROR] Failed to process observation {obs_id}: {e}")
+        return None
+    except (KeyError, TypeError, ValueError) as e:
+        # Unexpected API data for this observation; skip it, the rest are fine
+        print(f"[ERROR] Unexpected data in observation {obs_id}: {e!r}")
+        return None
+    except Exception as e:
+        if stopping.is_set():
+            # e.g. the photo pool was shut down under us; not worth reporting
+            return None
+        print(f"[ERROR] Failed to process observation {obs_id}: {e}")
+        if args.debug:
+            traceback.print_exc()
+        return None
+
 # -------------------- Main Execution --------------------
+# Observations are processed by a small pool of worker threads (--workers).
+# Every request still goes through the per-host rate limiters, so this only
+# overlaps network latency - it does not raise the request rate.
+OBSERVATION_WORKERS = args.workers
+# Observations queued ahead of the workers. get_observations is a generator, so
+# together this keeps memory flat for huge accounts
+MAX_IN_FLIGHT = OBSERVATION_WORKERS * 4
+# An observation that hits a transient network error (including a 429 that outlasted
+# the adapter's retries) goes to the back of the queue, up to this many tries in all
+OBSERVATION_ATTEMPTS = 3
+
+# CSV rows are written in batches. Each batch is flushed and fsynced, so an
+# interrupted run keeps everything up to the last batch without paying for
+# an fsync on every row.
+CSV_FLUSH_ROWS = 100
+CSV_FLUSH_SECONDS = 30
+
+def drop_partial_row(path):
+    """Cut off a last row left half-written by a crash, so its observation is redone
+    and the next appended row doesn't get glued onto it."""
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - 65536)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos < end:
+            f.truncate(pos)
+            print(f"[INFO] Dropped an incomplete last row from {path}")
+
+def flush_rows(f, writer, pending):
+    if pending:
+        writer.writerows(pending)
+        pending.clear()
+    f.flush()
+    os.fsync(f.fileno())
+
 try:
-    obs_ids = get_observation_ids(args.username, limit=args.limit)
-    
-    fieldnames = ["observation_id", "photo_filenames"]
-    if args.add_photo_urls:
-        fieldnames.extend(["photo_urls", "original_photo_urls"])
+    observations = get_observations(args.username, limit=args.limit)
 
-    with open(output_filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    # With --resume, the existing CSV doubles as the list of finished observations
+    resuming = args.resume and file_size(output_filename) > 0
+    if resuming:
+        drop_partial_row(output_filename)
+        # Only a half-written header was there: start the file over
+        resuming = file_size(output_filename) > 0
+    if resuming:
+        with open(output_filename, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames != fieldnames:
+                print(f"\n[!] Cannot resume: '{output_filename}' has columns {reader.fieldnames}")
+                print(f"    Expected {fieldnames}. Use the same --add-photo-urls setting as the original run.")
+                sys.exit(1)
+            done_ids = {row["observation_id"] for row in reader}
+        observations = (obs for obs in observations if str(obs["id"]) not in done_ids)
+        print(f"[INFO] Resuming: {len(done_ids)} observations already in {output_filename} will be skipped")
 
-        total_photos = 0
+    with open(output_filename, "a" if resuming else "w", buffering=1 << 20, newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not resuming:
+            writer.writerow(fieldnames)
+
+        total_images = 0
         downloaded_photos = 0
+        skipped_existing = 0
+        pending_rows = []
+        last_flush = time.monotonic()
 
-        for i, obs_id in enumerate(obs_ids, 1):
-            if args.debug:
-                print(f"[DEBUG] ({i}/{len(obs_ids)}) Processing observation {obs_id}")
+        executor = ThreadPoolExecutor(max_workers=OBSERVATION_WORKERS)
+        queued = iter(observations)
+        retry_queue = deque()
+        attempts = {}
+        in_flight = {}
+        finished = 0
+        try:
+            # Rows are written by this thread only, as each observation finishes.
+            while True:
+                while len(in_flight) < MAX_IN_FLIGHT:
+                    obs = next(queued, None)
+                    if obs is None and retry_queue:
+                        obs = retry_queue.popleft()
+                    if obs is None:
+                        break
+                    future = executor.submit(process_observation, obs["id"], obs["photos"])
+                    in_flight[future] = obs
+                if not in_flight:
+                    break
 
-            try:
-                photos = get_photo_ids(obs_id)
-                
-                if args.debug:
-                    print(f"[DEBUG] Found {len(photos)} photos for observation {obs_id}")
-                
-                filenames = []
-                photo_urls = []
-                original_urls = []
-                
-                for photo in photos:
-                    photo_id = photo["id"]
-                    photo_page_url = photo["photo_page_url"]
-                    
-                    # Scrape filename and original link from the photo page
-                    filename, original_link = scrape_photo_page(photo_id)
-                    
-                    if filename:
-                        filenames.append(filename)
-                        photo_urls.append(photo_page_url)
-                        original_urls.append(original_link if original_link else "")
-                        
-                        total_photos += 1
-                        
-                        if args.download:
-                            # Get the actual image URL and download
-                            success = False
-                            
-                            if original_link:
-                                # Method 1: Try to get the actual URL from original size page
-                                actual_image_url = get_actual_image_url(original_link)
-                                if actual_image_url:
-                                    success = download_image(actual_image_url, filename, obs_id)
-                            
-                            if not success:
-                                # Method 2: Try direct S3 URL construction as fallback
-                                print(f"[INFO] Trying direct S3 download for photo {photo_id}")
-                                success = direct_download_by_photo_id(photo_id, filename, obs_id)
-                            
-                            if success:
-                                downloaded_photos += 1
-                                print(f"[INFO] Successfully downloaded photo {photo_id}")
-                                # Guidelines: Limit media downloads to < 5GB/hour.
-                                # A 5MB image every ~4 seconds is approx 4.5GB/hour.
-                                # We wait 3s here + 1s standard rate limit = 4s total per image.
-                                time.sleep(3)
-                            else:
-                                print(f"[ERROR] All download methods failed for photo {photo_id}")
-                
-                row = {
-                    "observation_id": obs_id,
-                    "photo_filenames": ";".join(filenames),
-                }
-                
-                if args.add_photo_urls:
-                    row["photo_urls"] = ";".join(photo_urls)
-                    row["original_photo_urls"] = ";".join(original_urls)
-                    
-                writer.writerow(row)
-
-                if args.verbose:
-                    print(f"Observation {row['observation_id']}: {len(filenames)} photos found")
-
-            except Exception as e:
-                print(f"[ERROR] Failed to process observation {obs_id}: {e}")
-                continue
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    obs = in_flight.pop(future)
+                    obs_id = obs["id"]
+                    try:
+                        result = future.result()
+                    except requests.exceptions.RequestException as e:
+                        attempts[obs_id] = attempts.get(obs_id, 1) + 1
+                        if attempts[obs_id] <= OBSERVATION_ATTEMPTS:
+                            print(f"[INFO] Network error on observation {obs_id}, will retry: {e}")
+                            retry_queue.append(obs)
+                            continue
+                        print(f"[ERROR] Failed to process observation {obs_id} after {OBSERVATION_ATTEMPTS} attempts: {e}")
+                        result = None
+                    finished += 1
+                    if args.debug:
+                        print(f"[DEBUG] ({finished}) Finished observation {obs_id}")
+
+                    if result is None:
+                        continue
+
+                    row, photo_count, image_count, downloaded, skipped = result
+                    total_images += image_count
+                    downloaded_photos += downloaded
+                    skipped_existing += skipped
+                    pending_rows.append(row)
+
+                    if args.verbose:
+                        print(f"Observation {obs_id}: {photo_count} photos found")
+
+                if len(pending_rows) >= CSV_FLUSH_ROWS or time.monotonic() - last_flush >= CSV_FLUSH_SECONDS:
+                    flush_rows(f, writer, pending_rows)
+                    last_flush = time.monotonic()
+        finally:
+            # Drop queued work first, so Ctrl-C doesn't keep downloading in the background
+            stopping.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            photo_executor.shutdown(wait=False, cancel_futures=True)
+            # Also runs on Ctrl-C, so finished observations are never lost
+            flush_rows(f, writer, pending_rows)
 
 except KeyboardInterrupt:
     print("\n[INFO] Interrupted by user.")
@@ -509,9 +1206,13 @@ except IOError as e:
 
 except Exception as e:
     print(f"\n[!] Unexpected Error: {e}")
+    if args.debug:
+        traceback.print_exc()
     print("    If this persists, please report it to the developer.")
     sys.exit(1)
 
 print(f"\n[INFO] Done. Results saved to {output_filename}")
 if args.download:
-    print(f"[INFO] Downloaded {downloaded_photos} of {total_photos} images to {args.imagedir}/")
+    print(f"[INFO] Downloaded {downloaded_photos} of {total_images} images to {args.imagedir}/")
+    if skipped_existing:
+        print(f"[INFO] {skipped_existing} images were already downloaded and were skipped")